@@ -11,51 +11,150 @@ This script demonstrates different approaches to scrape all data from URLs:
 
 import sys
 import os
-import json
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import logging
+import threading
+import orjson
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 sys.path.append('.')
 
-from main import ContentExtractor, DatadogDocsScraper
+from main import ContentExtractor, DatadogDocsScraper, RateLimiter, flush_logging, parse_page, setup_logging, write_file
 
-def extract_content_parallel(urls, extractor, output_dir, delay):
-    """Extract content using parallel processing"""
+logger = logging.getLogger(__name__)
+
+def load_page_hashes(output_dir):
+    """Load the {filename: content hash} map written by the previous run, if any"""
+    try:
+        with open(f"{output_dir}/.hashes.json", 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return {}
+
+def save_page_hashes(output_dir, hashes):
+    """Persist the {filename: content hash} map for the next run"""
+    write_file(f"{output_dir}/.hashes.json", orjson.dumps(hashes))
+
+def save_page(content, extractor, output_dir, filename, hashes=None):
+    """Save one page as JSON and Markdown, encoding each file up front so it lands in a single write
+    
+    When a `hashes` map is given, pages whose content (ignoring the extraction
+    timestamp) matches the previous run are left untouched on disk.
+    """
+    json_path = f"{output_dir}/json/{filename}.json"
+    md_path = f"{output_dir}/markdown/{filename}.md"
+    
+    if hashes is not None:
+        digest = hashlib.blake2b(
+            orjson.dumps({k: v for k, v in content.items() if k != 'extracted_at'}),
+            digest_size=16
+        ).hexdigest()
+        if hashes.get(filename) == digest and os.path.exists(json_path) and os.path.exists(md_path):
+            return False
+        hashes[filename] = digest
+    
+    write_file(json_path, orjson.dumps(content, option=orjson.OPT_INDENT_2))
+    write_file(md_path, extractor._convert_to_markdown(content).encode('utf-8'))
+    return True
+
+class CombinedPageWriter:
+    """Append extracted pages to a JSON Lines file as soon as they are parsed
+    
+    Lets the extractors stream pages to disk instead of holding every page dict
+    in memory until the end of the run.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'wb', buffering=1 << 20)
+    
+    def add(self, content):
+        line = orjson.dumps(content, option=orjson.OPT_APPEND_NEWLINE)
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+    
+    def close(self):
+        self._file.close()
+
+def write_combined_json(path, metadata, encoded_pages):
+    """Stream {'metadata': ..., 'pages': [...]} to disk one page at a time
+    
+    `encoded_pages` yields each page already encoded as compact JSON bytes, so
+    the whole dataset never has to be held or encoded in memory at once; writes
+    go through a 1 MiB buffer so the file is flushed in large chunks.
+    """
+    with open(path, 'wb', buffering=1 << 20) as f:
+        f.write(b'{"metadata": ')
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
+        f.write(b',\n"pages": [')
+        for i, page in enumerate(encoded_pages):
+            f.write(b',\n' if i else b'\n')
+            f.write(page)
+        f.write(b'\n]}\n')
+
+def extract_content_parallel(urls, extractor, output_dir, delay, max_workers=None, hashes=None, sink=None):
+    """Extract content using parallel processing
+    
+    Pipeline of three pools: worker threads only download pages, a process pool
+    parses the HTML on every core (outside the GIL), and a writer pool saves the
+    resulting files. `delay` is enforced globally across download workers.
+    
+    Returns the extracted pages, unless a CombinedPageWriter `sink` is given, in
+    which case pages are streamed to it and an empty list is returned.
+    """
     all_content = []
+    max_workers = max_workers or min(32, len(urls)) or 1
+    limiter = RateLimiter(delay)
     
-    def extract_single_url(url_info):
+    def fetch_single_url(url_info):
         i, url = url_info
-        print(f"  [{i}/{len(urls)}] {url}")
+        limiter.wait()  # Still respect rate limiting
+        logger.info("  [%d/%d] %s", i, len(urls), url)
         
-        content = extractor.extract_content(url)
-        filename = extractor._url_to_filename(url)
+        html = extractor.fetch_html(url)
+        return url, html
+    
+    # Parsing runs on the extractor's shared pool, which outlives this call
+    parser = extractor.parse_pool()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            ThreadPoolExecutor(max_workers=os.cpu_count()) as writer:
+        fetch_futures = {executor.submit(fetch_single_url, url_info) for url_info in enumerate(urls, 1)}
+        pending = set(fetch_futures)
+        write_futures = []
         
-        # Save JSON
-        json_path = f"{output_dir}/json/{filename}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetch_futures:
+                    # Downloaded: hand the HTML to a parser process
+                    fetch_futures.discard(future)
+                    url, html = future.result()
+                    pending.add(parser.submit(parse_page, url, html))
+                else:
+                    # Parsed: save JSON + Markdown
+                    content = future.result()
+                    filename = extractor._url_to_filename(content['url'])
+                    write_futures.append(writer.submit(save_page, content, extractor, output_dir, filename, hashes))
+                    if sink is not None:
+                        sink.add(content)
+                    else:
+                        all_content.append(content)
         
-        # Save Markdown
-        md_path = f"{output_dir}/markdown/{filename}.md"
-        md_content = extractor._convert_to_markdown(content)
-        with open(md_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        
-        time.sleep(delay)  # Still respect rate limiting
-        return content
-    
-    # Use ThreadPoolExecutor for parallel processing
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        url_enumerated = list(enumerate(urls, 1))
-        future_to_url = {executor.submit(extract_single_url, url_info): url_info for url_info in url_enumerated}
-        
-        for future in as_completed(future_to_url):
-            content = future.result()
-            all_content.append(content)
+        # Surface any write errors
+        for future in write_futures:
+            future.result()
     
+    flush_logging()
     return all_content
 
-def extract_content_sequential(urls, extractor, output_dir, delay):
-    """Extract content sequentially (original method)"""
+def extract_content_sequential(urls, extractor, output_dir, delay, hashes=None, sink=None):
+    """Extract content sequentially (original method)
+    
+    Like extract_content_parallel, pages go to `sink` instead of the returned list when one is given.
+    """
     all_content = []
     
     for i, url in enumerate(urls, 1):
@@ -63,27 +162,20 @@ def extract_content_sequential(urls, extractor, output_dir, delay):
         
         # Extract content
         content = extractor.extract_content(url)
-        all_content.append(content)
+        if sink is not None:
+            sink.add(content)
+        else:
+            all_content.append(content)
         
-        # Save individual files
+        # Save individual files (JSON + Markdown)
         filename = extractor._url_to_filename(url)
-        
-        # JSON format
-        json_path = f"{output_dir}/json/{filename}.json"
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
-        
-        # Markdown format
-        md_path = f"{output_dir}/markdown/{filename}.md"
-        md_content = extractor._convert_to_markdown(content)
-        with open(md_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        save_page(content, extractor, output_dir, filename, hashes)
         
         time.sleep(delay)
     
     return all_content
 
-def scrape_all_comprehensive(max_depth=3, delay=0.3, output_dir="./comprehensive_scrape", parallel=True):
+def scrape_all_comprehensive(max_depth=3, delay=0.3, output_dir="./comprehensive_scrape", parallel=True, max_workers=None):
     """
     Comprehensive scraping approach:
     1. First discover all URLs with deeper depth
@@ -107,7 +199,8 @@ def scrape_all_comprehensive(max_depth=3, delay=0.3, output_dir="./comprehensive
     )
     
     start_time = time.time()
-    scraper.scrape_recursive(base_url)
+    with scraper:
+        scraper.scrape_recursive(base_url)
     discovery_time = time.time() - start_time
     
     print(f"✅ Discovered {len(scraper.visited)} URLs in {discovery_time:.2f}s")
@@ -124,61 +217,67 @@ def scrape_all_comprehensive(max_depth=3, delay=0.3, output_dir="./comprehensive
     
     # Extract content with progress tracking
     urls = sorted(scraper.visited)
-    all_content = []
+    
+    # Hashes from the previous run let unchanged pages skip their file writes
+    hashes = load_page_hashes(output_dir)
+    
+    # Pages are streamed to all_content.jsonl instead of being kept in memory
+    sink = CombinedPageWriter(f"{output_dir}/combined/all_content.jsonl")
     
     start_extraction = time.time()
     
-    if parallel and len(urls) > 10:
-        # Parallel processing for large datasets
-        print("⚡ Using parallel processing for faster extraction...")
-        all_content = extract_content_parallel(urls, extractor, output_dir, delay)
-    else:
-        # Sequential processing
-        print("🔄 Using sequential processing...")
-        all_content = extract_content_sequential(urls, extractor, output_dir, delay)
+    try:
+        if parallel and len(urls) > 10:
+            # Parallel processing for large datasets
+            print("⚡ Using parallel processing for faster extraction...")
+            extract_content_parallel(urls, extractor, output_dir, delay, max_workers, hashes, sink)
+        else:
+            # Sequential processing
+            print("🔄 Using sequential processing...")
+            extract_content_sequential(urls, extractor, output_dir, delay, hashes, sink)
+    finally:
+        sink.close()
+        extractor.close()
     
     extraction_time = time.time() - start_extraction
+    save_page_hashes(output_dir, hashes)
+    pages_extracted = sink.count
     
     # Step 3: Save combined data
     print(f"\n💾 Phase 3: Saving combined datasets...")
     
-    # Combined JSON
-    with open(f"{output_dir}/combined/all_content.json", 'w', encoding='utf-8') as f:
-        json.dump({
-            'metadata': {
-                'total_pages': len(all_content),
-                'base_url': base_url,
-                'max_depth': max_depth,
-                'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
-                'discovery_time': discovery_time,
-                'extraction_time': extraction_time,
-                'total_time': discovery_time + extraction_time
-            },
-            'pages': all_content
-        }, f, indent=2, ensure_ascii=False)
+    # Combined JSON, copied line by line from the JSONL stream
+    with open(sink.path, 'rb') as lines:
+        write_combined_json(f"{output_dir}/combined/all_content.json", {
+            'total_pages': pages_extracted,
+            'base_url': base_url,
+            'max_depth': max_depth,
+            'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'discovery_time': discovery_time,
+            'extraction_time': extraction_time,
+            'total_time': discovery_time + extraction_time
+        }, (line.rstrip(b'\n') for line in lines))
     
     # URL list
-    with open(f"{output_dir}/combined/all_urls.txt", 'w', encoding='utf-8') as f:
-        f.write(f"All Scraped URLs from {base_url}\n")
-        f.write(f"Total: {len(urls)} URLs\n")
-        f.write(f"Scraped: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("="*80 + "\n\n")
-        for i, url in enumerate(urls, 1):
-            f.write(f"{i}. {url}\n")
+    header = (f"All Scraped URLs from {base_url}\n"
+              f"Total: {len(urls)} URLs\n"
+              f"Scraped: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+              + "="*80 + "\n\n")
+    body = ''.join(f"{i}. {url}\n" for i, url in enumerate(urls, 1))
+    write_file(f"{output_dir}/combined/all_urls.txt", (header + body).encode('utf-8'))
     
     # Statistics
     stats = {
         'total_urls': len(urls),
-        'total_pages_extracted': len(all_content),
+        'total_pages_extracted': pages_extracted,
         'discovery_time': discovery_time,
         'extraction_time': extraction_time,
         'total_time': discovery_time + extraction_time,
-        'average_time_per_page': extraction_time / len(all_content) if all_content else 0,
+        'average_time_per_page': extraction_time / pages_extracted if pages_extracted else 0,
         'output_directory': output_dir
     }
     
-    with open(f"{output_dir}/combined/statistics.json", 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=2)
+    write_file(f"{output_dir}/combined/statistics.json", orjson.dumps(stats, option=orjson.OPT_INDENT_2))
     
     print(f"\n✨ COMPLETE data scraping finished!")
     print(f"📊 Final Statistics:")
@@ -191,7 +290,7 @@ def scrape_all_comprehensive(max_depth=3, delay=0.3, output_dir="./comprehensive
     print(f"   • Processing method: {'Parallel' if parallel else 'Sequential'}")
     print(f"📁 ALL DATA saved to: {output_dir}/")
     print(f"💾 Individual files: {len(urls)} JSON + {len(urls)} Markdown")
-    print(f"📦 Combined dataset: all_content.json ({len(all_content)} pages)")
+    print(f"📦 Combined dataset: all_content.json ({pages_extracted} pages)")
     
     return stats
 
@@ -204,24 +303,21 @@ def scrape_specific_urls(urls, output_dir="./specific_scrape"):
     os.makedirs(f"{output_dir}/markdown", exist_ok=True)
     
     results = []
-    for i, url in enumerate(urls, 1):
-        print(f"  [{i}/{len(urls)}] {url}")
-        
-        content = extractor.extract_content(url)
-        results.append(content)
-        
-        filename = extractor._url_to_filename(url)
-        
-        # Save JSON
-        with open(f"{output_dir}/json/{filename}.json", 'w', encoding='utf-8') as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
-        
-        # Save Markdown
-        md_content = extractor._convert_to_markdown(content)
-        with open(f"{output_dir}/markdown/{filename}.md", 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        
-        time.sleep(0.5)
+    try:
+        for i, url in enumerate(urls, 1):
+            print(f"  [{i}/{len(urls)}] {url}")
+            
+            content = extractor.extract_content(url)
+            results.append(content)
+            
+            filename = extractor._url_to_filename(url)
+            
+            # Save JSON + Markdown
+            save_page(content, extractor, output_dir, filename)
+            
+            time.sleep(0.5)
+    finally:
+        extractor.close()
     
     print(f"✅ Scraped {len(results)} URLs to {output_dir}/")
     return results
@@ -230,8 +326,8 @@ def scrape_by_category(base_url="https://docs.datadoghq.com/", category_prefix=N
     """Scrape URLs that match a specific category/prefix"""
     print(f"📂 Scraping by category: {category_prefix or 'all'}")
     
-    scraper = DatadogDocsScraper(base_url=base_url, max_depth=max_depth)
-    scraper.scrape_recursive(base_url)
+    with DatadogDocsScraper(base_url=base_url, max_depth=max_depth) as scraper:
+        scraper.scrape_recursive(base_url)
     
     if category_prefix:
         filtered_urls = [url for url in scraper.visited if category_prefix in url]
@@ -242,7 +338,7 @@ def scrape_by_category(base_url="https://docs.datadoghq.com/", category_prefix=N
     
     return scrape_specific_urls(filtered_urls, f"./category_scrape_{category_prefix or 'all'}")
 
-def scrape_everything(output_dir="./everything_scrape"):
+def scrape_everything(output_dir="./everything_scrape", max_workers=None):
     """Scrape absolutely everything with maximum depth and coverage"""
     print("🌍 SCRAPING EVERYTHING - Maximum Coverage Mode")
     print("="*80)
@@ -260,7 +356,8 @@ def scrape_everything(output_dir="./everything_scrape"):
         max_depth=4,  # Very deep
         delay=0.2,    # Faster but still respectful
         output_dir=output_dir,
-        parallel=True
+        parallel=True,
+        max_workers=max_workers
     )
 
 if __name__ == "__main__":
@@ -276,8 +373,10 @@ if __name__ == "__main__":
     parser.add_argument('--urls', nargs='*', help='Specific URLs to scrape')
     parser.add_argument('--parallel', action='store_true', default=True, help='Use parallel processing (default: True)')
     parser.add_argument('--sequential', action='store_true', help='Force sequential processing')
+    parser.add_argument('--workers', type=int, default=None, help='Parallel download workers (default: min(32, number of URLs))')
     
     args = parser.parse_args()
+    setup_logging()
     
     # Handle parallel vs sequential
     if args.sequential:
@@ -286,9 +385,9 @@ if __name__ == "__main__":
         parallel = args.parallel
     
     if args.mode == 'comprehensive':
-        scrape_all_comprehensive(args.max_depth, args.delay, args.output_dir, parallel)
+        scrape_all_comprehensive(args.max_depth, args.delay, args.output_dir, parallel, args.workers)
     elif args.mode == 'everything':
-        scrape_everything(args.output_dir)
+        scrape_everything(args.output_dir, args.workers)
     elif args.mode == 'specific' and args.urls:
         scrape_specific_urls(args.urls, args.output_dir)
     elif args.mode == 'category':
@@ -19,20 +19,22 @@ def compare_depths():
     depths = [1, 2, 3]
     results = {}
     
-    for depth in depths:
-        print(f"\n📊 Testing depth {depth}...")
-        scraper = DatadogDocsScraper(base_url=base_url, max_depth=depth, delay=0.2)
+    # A single crawl at the deepest level; shallower depths are subsets of it
+    print(f"\n📊 Crawling to depth {max(depths)}...")
+    with DatadogDocsScraper(base_url=base_url, max_depth=max(depths), delay=0.2) as scraper:
         scraper.scrape_recursive(base_url)
+    
+    for depth in depths:
+        urls = sorted(url for url, found_at in scraper.url_depth.items() if found_at <= depth)
         
-        results[depth] = len(scraper.visited)
-        print(f"   Depth {depth}: {len(scraper.visited)} URLs found")
+        results[depth] = len(urls)
+        print(f"\n📊 Depth {depth}: {len(urls)} URLs found")
         
         # Show some sample URLs
-        sample_urls = sorted(list(scraper.visited))[:5]
-        for url in sample_urls:
+        for url in urls[:5]:
             print(f"     • {url}")
-        if len(scraper.visited) > 5:
-            print(f"     ... and {len(scraper.visited) - 5} more")
+        if len(urls) > 5:
+            print(f"     ... and {len(urls) - 5} more")
     
     print(f"\n📈 RESULTS COMPARISON:")
     print("="*80)
@@ -37,7 +37,7 @@ class LocalAutomatedScraper:
         
         # Build command
         cmd = [
-            sys.executable, "comprehensive_scraper.py",
+            sys.executable, "-u", "comprehensive_scraper.py",
             "--mode", "comprehensive",
             "--max-depth", str(max_depth),
             "--delay", str(delay),
@@ -52,14 +52,17 @@ class LocalAutomatedScraper:
         # Run the scraper
         start_time = time.time()
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=self.base_dir)
-            if result.returncode != 0:
-                print(f"❌ Scraper failed with error:")
-                print(result.stderr)
+            # Stream the scraper's output as it runs instead of buffering it all
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, bufsize=1, cwd=self.base_dir)
+            for line in proc.stdout:
+                sys.stdout.write(line)
+            returncode = proc.wait()
+            if returncode != 0:
+                print(f"❌ Scraper failed with exit code {returncode}")
                 return False
             else:
                 print(f"✅ Scraper completed successfully!")
-                print(result.stdout)
         except Exception as e:
             print(f"❌ Error running scraper: {e}")
             return False
@@ -147,20 +150,40 @@ class LocalAutomatedScraper:
         return archives_created
         
     def create_tar_archive(self, archive_path, source_paths):
-        """Create a tar.gz archive from source paths"""
+        """Create a tar.gz archive from source paths
+        
+        Pipes `tar` into `pigz` so compression runs on every core; falls back to
+        the single-threaded tarfile module when either tool is unavailable.
+        """
+        paths = [path for path in source_paths if path and path.exists()]
+        
+        if shutil.which('tar') and shutil.which('pigz'):
+            # One "-C parent name" pair per path keeps arcname=path.name
+            tar_cmd = ['tar', '-cf', '-']
+            for path in paths:
+                tar_cmd += ['-C', str(path.parent), path.name]
+            
+            with open(archive_path, 'wb') as out:
+                tar = subprocess.Popen(tar_cmd, stdout=subprocess.PIPE)
+                pigz = subprocess.Popen(['pigz', '-p', str(os.cpu_count() or 1)],
+                                        stdin=tar.stdout, stdout=out)
+                tar.stdout.close()
+                pigz_status = pigz.wait()
+                tar_status = tar.wait()
+            
+            if tar_status == 0 and pigz_status == 0:
+                return
+            print(f"⚠️ tar | pigz failed for {archive_path}, falling back to tarfile")
+        
         import tarfile
         
         with tarfile.open(archive_path, 'w:gz') as tar:
-            for path in source_paths:
-                if path and path.exists():
-                    if path.is_dir():
-                        tar.add(path, arcname=path.name)
-                    else:
-                        tar.add(path, arcname=path.name)
+            for path in paths:
+                tar.add(path, arcname=path.name)
                         
     def get_directory_size(self, path):
         """Get human-readable directory size"""
-        total_size = sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+        total_size = self._scan_size(path)
         
         for unit in ['B', 'KB', 'MB', 'GB']:
             if total_size < 1024.0:
@@ -168,6 +191,17 @@ class LocalAutomatedScraper:
             total_size /= 1024.0
         return f"{total_size:.1f}TB"
         
+    def _scan_size(self, path):
+        """Sum file sizes under path using scandir's cached entry metadata"""
+        total = 0
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    total += self._scan_size(entry.path)
+                elif entry.is_file():
+                    total += entry.stat().st_size
+        return total
+        
     def get_directory_tree(self, path, max_depth=3, current_depth=0):
         """Get directory tree structure"""
         if current_depth >= max_depth:
@@ -177,17 +211,19 @@ class LocalAutomatedScraper:
         indent = "  " * current_depth
         
         try:
-            items = sorted(path.iterdir())
-            for item in items[:10]:  # Limit to first 10 items
-                if item.is_dir():
-                    tree += f"{indent}{item.name}/\n"
+            # One directory listing per level; DirEntry caches the type lookups
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+            for entry in entries[:10]:  # Limit to first 10 items
+                if entry.is_dir():
+                    tree += f"{indent}{entry.name}/\n"
                     if current_depth < max_depth - 1:
-                        tree += self.get_directory_tree(item, max_depth, current_depth + 1)
+                        tree += self.get_directory_tree(entry.path, max_depth, current_depth + 1)
                 else:
-                    tree += f"{indent}{item.name}\n"
+                    tree += f"{indent}{entry.name}\n"
                     
-            if len(list(path.iterdir())) > 10:
-                tree += f"{indent}... ({len(list(path.iterdir())) - 10} more items)\n"
+            if len(entries) > 10:
+                tree += f"{indent}... ({len(entries) - 10} more items)\n"
                 
         except PermissionError:
             tree += f"{indent}[Permission Denied]\n"
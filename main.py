@@ -34,24 +34,233 @@ Features:
 import sys
 import os
 import re
-import json
 import time
+import queue
+import atexit
+import logging
+import gzip
+import hashlib
+import sqlite3
+import orjson
 import requests
 import threading
+import multiprocessing
 import argparse
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from bs4 import BeautifulSoup
+from html import unescape
+from html.parser import HTMLParser
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 from typing import Optional, Set, List, Dict
+from contextlib import asynccontextmanager
 
 # FastAPI imports (only used in API mode)
 from fastapi import FastAPI, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
 
+# ============================================================================
+# Shared Helpers
+# ============================================================================
+
+# '/' and '_' become '-', and every other ASCII character outside [\w-] is dropped
+_FILENAME_TRANS = str.maketrans({
+    c: ('-' if c in '/_' else None)
+    for c in map(chr, range(128))
+    if not (c.isalnum() or c == '-')
+})
+
+
+@lru_cache(maxsize=None)
+def url_to_filename(url: str) -> str:
+    """Convert URL to safe filename (pure, so results are cached per URL)"""
+    parsed = urlparse(url)
+    
+    # Use path for filename
+    path = parsed.path.strip('/')
+    if not path:
+        return 'index'
+        
+    # Replace slashes and special characters in one C-level pass
+    filename = path.translate(_FILENAME_TRANS)
+    if not filename.isascii():
+        filename = re.sub(r'[^\w\-]', '', filename)
+    
+    # Limit length
+    return filename[:200] if filename else 'index'
+
+
+@lru_cache(maxsize=None)
+def url_path_parts(url: str) -> tuple:
+    """Split a URL's path into its '/'-separated segments (cached per URL)"""
+    return tuple(urlparse(url).path.strip('/').split('/'))
+
+
+# Plain http(s) URLs with no ;params, whitespace or IPv6 host, which are split
+# identically to urlparse; anything else falls back to urlparse
+_PLAIN_URL_RE = re.compile(r'(https?)://([^/?#\[\]\s]*)((?:/[^?#;\s]*)?)(?:[?#]|$)')
+
+
+@lru_cache(maxsize=200_000)
+def split_url(url: str) -> tuple:
+    """Parse a URL once into (lowercased host, normalized URL), cached per URL
+    
+    The normalized form drops the query string, fragment and trailing slash and
+    is interned, so every place that stores it shares one string object.
+    """
+    match = _PLAIN_URL_RE.match(url)
+    if match:
+        scheme, netloc, path = match.groups()
+    else:
+        scheme, netloc, path = urlparse(url)[:3]
+    netloc = netloc.lower()
+    normalized = f"{scheme}://{netloc}{path}"
+    if normalized.endswith('/'):
+        normalized = normalized[:-1]
+    return netloc, sys.intern(normalized)
+
+
+logger = logging.getLogger(__name__)
+
+_log_listener = None  # Started by setup_logging()
+_log_flush_lock = threading.Lock()
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """Route log records through a queue to a background thread that prints them
+    
+    Crawl workers only enqueue a record per page, so they never wait on stdout.
+    """
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    listener = QueueListener(log_queue, handler)
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    global _log_listener
+    _log_listener = listener
+    return listener
+
+
+def flush_logging():
+    """Wait until every queued log record has been printed
+    
+    Called when a crawl finishes, so its per-page lines never show up after
+    the summary that is printed next.
+    """
+    with _log_flush_lock:
+        if _log_listener is not None:
+            # stop() drains the queue and joins the thread; start() resumes it
+            _log_listener.stop()
+            _log_listener.start()
+
+
+def parser_pool() -> ProcessPoolExecutor:
+    """Process pool for HTML parsing, one worker per core
+    
+    Pools are created in processes that already run fetch, logging or server
+    threads, where fork() can deadlock the child on a lock another thread held,
+    so workers come from the forkserver where the platform has one (Windows
+    uses its default, spawn). Like spawn, this re-imports the entry script in
+    the workers, so scripts that crawl must use an `if __name__ == '__main__'` guard.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+    else:
+        context = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=context)
+
+
+def create_session(pool_maxsize: int = 50) -> requests.Session:
+    """Build a keep-alive requests.Session with retries for transient 429/5xx errors"""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def write_file(path: str, payload: bytes):
+    """Write pre-encoded bytes to path using raw file descriptor calls
+    
+    Skips the buffered file object setup (fstat/isatty) that open() and
+    Path.write_bytes perform, so each small output file costs just
+    open + write + close.
+    """
+    # O_BINARY (Windows only) stops the C runtime from turning LF into CRLF
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces request starts at least `delay` seconds apart
+    
+    Shared by concurrent workers so the overall request rate stays at 1/delay
+    no matter how many threads are fetching.
+    """
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Block until the caller may issue its next request"""
+        if self.delay <= 0:
+            return
+        
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.delay
+        
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class HostRateLimiter:
+    """One RateLimiter per host, so `delay` bounds the rate against each server
+    
+    Requests to different hosts never wait on each other.
+    """
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._limiters = {}
+    
+    def wait(self, url: str):
+        """Block until the caller may issue its next request to url's host"""
+        if self.delay <= 0:
+            return
+        
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(self.delay)
+        limiter.wait()
+
+
 # ============================================================================
 # Content Extraction Classes
 # ============================================================================
@@ -59,17 +268,91 @@ import uvicorn
 class ContentExtractor:
     """Extract clean content from web pages for RAG"""
     
+    # Compiled once and shared by every parse instead of rebuilt per page
+    _content_re = re.compile(r'content|main|article', re.I)
+    _blank_lines_re = re.compile(r'\n{3,}')
+    _spaces_re = re.compile(r' {2,}')
+    _parser = 'lxml'
+    
     def __init__(self):
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         }
+        
+        # One pooled session so repeated fetches reuse keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32,
+                              max_retries=Retry(total=3, backoff_factor=0.2))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._parse_pool = None  # Created by the first parse_pool() call
+    
+    def parse_pool(self) -> ProcessPoolExecutor:
+        """Parser process pool shared by every batch run with this extractor; close() shuts it down"""
+        if self._parse_pool is None:
+            self._parse_pool = parser_pool()
+        return self._parse_pool
+    
+    def close(self):
+        """Shut down the parser processes and release pooled connections"""
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+        self.session.close()
     
     def extract_content(self, url: str) -> Dict:
         """Extract clean content from a page"""
-        response = requests.get(url, headers=self.headers, timeout=15)
-        response.raise_for_status()
+        return self.parse_html(url, self.fetch_html(url))
+    
+    def extract_content_batch(self, urls: List[str], max_workers: int = 32,
+                              delay: float = 0.0) -> List[Dict]:
+        """Extract many pages concurrently, returning results in the order of `urls`
+        
+        Downloads overlap on the shared session's connection pool, with `delay`
+        still spacing out request starts across all workers; the downloaded HTML
+        is then parsed on a process pool so parsing scales past the GIL. Pages
+        that fail come back as empty content instead of aborting the batch.
+        """
+        limiter = RateLimiter(delay)
+        total = len(urls)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+        def fetch_one(item):
+            i, url = item
+            limiter.wait()
+            logger.info("  [%d/%d] %s", i, total, url)
+            try:
+                return self.fetch_html(url)
+            except Exception as e:
+                logger.warning("  ❌ Error extracting %s: %s", url, e)
+                return None
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+            pages = list(executor.map(fetch_one, enumerate(urls, 1)))
+        
+        fetched = [(url, html) for url, html in zip(urls, pages) if html is not None]
+        parsed = {}
+        if fetched:
+            pool = self.parse_pool()
+            futures = [(url, pool.submit(parse_page, url, html)) for url, html in fetched]
+            for url, future in futures:
+                try:
+                    parsed[url] = future.result()
+                except Exception as e:
+                    logger.warning("  ❌ Error extracting %s: %s", url, e)
+        
+        flush_logging()
+        return [parsed.get(url) or self._empty_content(url) for url in urls]
+    
+    def fetch_html(self, url: str) -> bytes:
+        """Download the raw HTML of a page (network-bound half of extract_content)"""
+        response = self.session.get(url, timeout=15)
+        response.raise_for_status()
+        return response.content
+    
+    def parse_html(self, url: str, html: bytes) -> Dict:
+        """Extract clean content from already-downloaded HTML (CPU-bound half of extract_content)"""
+        soup = BeautifulSoup(html, self._parser)
         
         # Remove unwanted elements
         for element in soup(['nav', 'header', 'footer', 'script', 'style', 'iframe']):
@@ -79,7 +362,7 @@ class ContentExtractor:
         main_content = (
             soup.find('main') or 
             soup.find('article') or 
-            soup.find('div', {'class': re.compile(r'content|main|article', re.I)}) or
+            soup.find('div', {'class': self._content_re}) or
             soup.body
         )
         
@@ -88,9 +371,8 @@ class ContentExtractor:
         
         # Extract components
         title = self._extract_title(soup, main_content)
-        headings = self._extract_headings(main_content)
+        headings, code_blocks = self._extract_headings_and_code(main_content)
         text = main_content.get_text(separator='\n', strip=True)
-        code_blocks = self._extract_code_blocks(main_content)
         text = self._clean_text(text)
         
         return {
@@ -107,20 +389,20 @@ class ContentExtractor:
         title = soup.find('h1') or soup.find('title') or content.find('h1')
         return title.get_text(strip=True) if title else "Untitled"
     
-    def _extract_headings(self, content) -> List[Dict]:
+    def _extract_headings_and_code(self, content):
+        """Collect headings and code blocks in a single traversal of the content tree"""
         headings = []
-        for tag in content.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            headings.append({
-                'level': int(tag.name[1]),
-                'text': tag.get_text(strip=True),
-                'id': tag.get('id', '')
-            })
-        return headings
-    
-    def _extract_code_blocks(self, content) -> List[Dict]:
         code_blocks = []
-        for pre in content.find_all('pre'):
-            code = pre.find('code')
+        for tag in content.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre']):
+            if tag.name != 'pre':
+                headings.append({
+                    'level': int(tag.name[1]),
+                    'text': tag.get_text(strip=True),
+                    'id': tag.get('id', '')
+                })
+                continue
+            
+            code = tag.find('code')
             if code:
                 classes = code.get('class', [])
                 language = 'text'
@@ -132,12 +414,11 @@ class ContentExtractor:
                     'language': language,
                     'code': code.get_text(strip=False)
                 })
-        return code_blocks
+        return headings, code_blocks
     
     def _clean_text(self, text: str) -> str:
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        text = re.sub(r' {2,}', ' ', text)
-        return text.strip()
+        text = self._blank_lines_re.sub('\n\n', text)
+        return self._spaces_re.sub(' ', text).strip()
     
     def _empty_content(self, url: str) -> Dict:
         return {
@@ -185,14 +466,12 @@ class ContentExtractor:
             
             if format_type == 'json':
                 filepath = os.path.join(output_dir, f"{filename}.json")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(content, f, indent=2, ensure_ascii=False)
+                write_file(filepath, orjson.dumps(content, option=orjson.OPT_INDENT_2))
                     
             elif format_type == 'markdown':
                 filepath = os.path.join(output_dir, f"{filename}.md")
                 markdown_content = self._convert_to_markdown(content)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(markdown_content)
+                write_file(filepath, markdown_content.encode('utf-8'))
             
             if filepath:
                 stats['files_created'].append(filepath)
@@ -206,24 +485,11 @@ class ContentExtractor:
     
     def _url_to_filename(self, url: str) -> str:
         """Convert URL to safe filename"""
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        
-        # Use path for filename
-        path = parsed.path.strip('/')
-        if not path:
-            return 'index'
-            
-        # Replace slashes and special characters
-        filename = path.replace('/', '-').replace('_', '-')
-        filename = re.sub(r'[^\w\-]', '', filename)
-        
-        # Limit length
-        return filename[:200] if filename else 'index'
+        return url_to_filename(url)
     
     def _convert_to_markdown(self, content: Dict) -> str:
         """Convert extracted content to markdown format"""
-        md = f"""---
+        parts = [f"""---
 url: {content['url']}
 title: {content['title']}
 word_count: {content['word_count']}
@@ -236,73 +502,121 @@ extracted_at: {content['extracted_at']}
 **Extracted:** {content['extracted_at']}
 **Word Count:** {content['word_count']}
 
-"""
+"""]
         
         # Add headings structure
         if content['headings']:
-            md += "## Document Structure\n\n"
-            for heading in content['headings']:
-                indent = "  " * (heading['level'] - 1)
-                md += f"{indent}- {heading['text']}\n"
-            md += "\n"
+            parts.append("## Document Structure\n\n")
+            parts.extend(
+                f"{'  ' * (heading['level'] - 1)}- {heading['text']}\n"
+                for heading in content['headings']
+            )
+            parts.append("\n")
         
         # Add main content
         if content['text']:
-            md += "## Content\n\n"
-            md += content['text'] + "\n\n"
+            parts.extend(("## Content\n\n", content['text'], "\n\n"))
         
         # Add code blocks
         if content['code_blocks']:
-            md += "## Code Examples\n\n"
+            parts.append("## Code Examples\n\n")
             for i, code_block in enumerate(content['code_blocks'], 1):
-                md += f"### Code Block {i} ({code_block['language']})\n\n"
-                md += f"```{code_block['language']}\n{code_block['code']}\n```\n\n"
+                parts.append(f"### Code Block {i} ({code_block['language']})\n\n")
+                parts.append(f"```{code_block['language']}\n{code_block['code']}\n```\n\n")
         
-        return md
+        return ''.join(parts)
+
+
+_worker_extractor = None
+
+def parse_page(url: str, html: bytes) -> Dict:
+    """Parse downloaded HTML inside a parser process (module-level so it pickles)"""
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = ContentExtractor()
+    return _worker_extractor.parse_html(url, html)
 
 
 class RAGExporter:
     """Export scraped data in RAG-optimized formats"""
     
+    _title_trans = str.maketrans('-_', '  ')
+    
+    # Frontmatter + body for save_markdown, filled with a single str.format call
+    _MD_TEMPLATE = """---
+url: {url}
+category: {category}
+depth: {depth}
+title: {title}
+parent_url: {parent_url}
+scraped_at: {scraped_at}
+source: datadog_docs
+---
+
+# {title}
+
+**URL:** [{url}]({url})
+**Category:** {category}
+
+<!-- Content extraction requires full scraping with --extract-content flag -->
+
+This document was scraped from Datadog documentation.
+
+"""
+    
     def __init__(self, scraper):
         self.scraper = scraper
         
+        # child -> first parent that links to it, and parent -> child URLs, built
+        # once instead of scanning links_tree for every exported URL
+        self._parent_index = {}
+        self._children_index = {}
+        for parent, children in scraper.links_tree.items():
+            self._children_index[parent] = children
+            for child_url in children:
+                self._parent_index.setdefault(child_url, parent)
+        
+        # Shared by all three exporters
+        self._base_depth = len(url_path_parts(scraper.base_url))
+        self._sorted_visited = sorted(scraper.visited)
+        self._depths = {url: self._compute_depth(url) for url in self._sorted_visited}
+        
     def _categorize_url(self, url: str) -> str:
-        path_parts = urlparse(url).path.strip('/').split('/')
-        return path_parts[0] if path_parts and path_parts[0] else 'root'
+        path_parts = url_path_parts(url)
+        return path_parts[0] if path_parts[0] else 'root'
     
     def _extract_title_from_url(self, url: str) -> str:
-        path = urlparse(url).path.strip('/')
-        if not path:
+        last = url_path_parts(url)[-1]
+        if not last:
             return "Home"
-        title = path.split('/')[-1].replace('-', ' ').replace('_', ' ').title()
+        title = last.translate(self._title_trans).title()
         return title or "Home"
     
     def _url_to_filename(self, url: str) -> str:
-        path = urlparse(url).path.strip('/')
-        filename = path.replace('/', '-').replace('_', '-')
-        filename = re.sub(r'[^\w\-]', '', filename)
-        return filename[:200] or 'index'
+        return url_to_filename(url)
     
     def _get_depth(self, url: str) -> int:
-        base_parts = urlparse(self.scraper.base_url).path.strip('/').split('/')
-        url_parts = urlparse(url).path.strip('/').split('/')
-        return len(url_parts) - len(base_parts)
+        depth = self._depths.get(url)
+        return depth if depth is not None else self._compute_depth(url)
+    
+    def _compute_depth(self, url: str) -> int:
+        return len(url_path_parts(url)) - self._base_depth
     
     def _get_parent_url(self, url: str) -> Optional[str]:
-        for parent, children in self.scraper.links_tree.items():
-            for child in children:
-                if child['url'] == url:
-                    return parent
-        return None
+        parent = self._parent_index.get(url)
+        if parent is None:
+            # Resolve non-canonical spellings (trailing slash, query, fragment)
+            parent = self._parent_index.get(self.scraper.normalize_url(url))
+        return parent
     
     def save_jsonl(self, filename: str = 'output/datadog_rag.jsonl') -> int:
         """Save in JSONL format for vector databases"""
         os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
         
+        now_iso = datetime.now().isoformat()
         count = 0
-        with open(filename, 'w', encoding='utf-8') as f:
-            for i, url in enumerate(sorted(self.scraper.visited), 1):
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            for i, url in enumerate(self._sorted_visited, 1):
                 doc = {
                     'id': f'datadog_doc_{i}',
                     'url': url,
@@ -312,12 +626,12 @@ class RAGExporter:
                         'category': self._categorize_url(url),
                         'depth': self._get_depth(url),
                         'parent_url': self._get_parent_url(url),
-                        'scraped_at': datetime.now().isoformat(),
+                        'scraped_at': now_iso,
                         'source': 'datadog_docs',
                         'base_url': self.scraper.base_url
                     }
                 }
-                f.write(json.dumps(doc, ensure_ascii=False) + '\n')
+                f.write(orjson.dumps(doc, option=orjson.OPT_APPEND_NEWLINE))
                 count += 1
         
         print(f"✅ Exported {count} documents to {filename} (JSONL format)")
@@ -327,46 +641,40 @@ class RAGExporter:
         """Save as individual markdown files"""
         os.makedirs(output_dir, exist_ok=True)
         
-        count = 0
-        for url in sorted(self.scraper.visited):
+        now_iso = datetime.now().isoformat()
+        filepaths = []
+        payloads = []
+        category_dirs = set()
+        for url in self._sorted_visited:
             category = self._categorize_url(url)
             safe_filename = self._url_to_filename(url)
             parent_url = self._get_parent_url(url)
             
-            # Create category subdirectory
+            # Category subdirectories are created once, before the writes
             category_dir = os.path.join(output_dir, category)
-            os.makedirs(category_dir, exist_ok=True)
+            category_dirs.add(category_dir)
             
             # Build markdown with frontmatter
-            frontmatter = f"""---
-url: {url}
-category: {category}
-depth: {self._get_depth(url)}
-title: {self._extract_title_from_url(url)}
-parent_url: {parent_url or 'none'}
-scraped_at: {datetime.now().isoformat()}
-source: datadog_docs
----
-
-"""
-            
-            content = f"""# {self._extract_title_from_url(url)}
-
-**URL:** [{url}]({url})
-**Category:** {category}
-
-<!-- Content extraction requires full scraping with --extract-content flag -->
-
-This document was scraped from Datadog documentation.
-
-"""
+            document = self._MD_TEMPLATE.format(
+                url=url,
+                category=category,
+                depth=self._get_depth(url),
+                title=self._extract_title_from_url(url),
+                parent_url=parent_url or 'none',
+                scraped_at=now_iso
+            )
             
-            filepath = os.path.join(category_dir, f"{safe_filename}.md")
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(frontmatter + content)
-            
-            count += 1
+            filepaths.append(os.path.join(category_dir, f"{safe_filename}.md"))
+            payloads.append(document.encode('utf-8'))
+        
+        for category_dir in category_dirs:
+            os.makedirs(category_dir, exist_ok=True)
+        
+        # One file per URL: overlap the open/write/close syscalls across threads
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(write_file, filepaths, payloads))
         
+        count = len(filepaths)
         print(f"✅ Exported {count} markdown files to {output_dir}/")
         return count
     
@@ -374,16 +682,14 @@ This document was scraped from Datadog documentation.
         """Save enhanced JSON with rich metadata"""
         os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
         
+        now_iso = datetime.now().isoformat()
         documents = []
-        categories = {}
+        categories = defaultdict(list)
         
-        for i, url in enumerate(sorted(self.scraper.visited), 1):
+        for i, url in enumerate(self._sorted_visited, 1):
             category = self._categorize_url(url)
             parent = self._get_parent_url(url)
-            children = [child['url'] for child in self.scraper.links_tree.get(url, [])]
-            
-            if category not in categories:
-                categories[category] = []
+            children = self._children_index.get(url, [])
             categories[category].append(url)
             
             doc = {
@@ -397,7 +703,7 @@ This document was scraped from Datadog documentation.
                     'parent_url': parent,
                     'child_urls': children,
                     'child_count': len(children),
-                    'scraped_at': datetime.now().isoformat(),
+                    'scraped_at': now_iso,
                     'source': 'datadog_docs',
                     'language': 'en'
                 }
@@ -410,15 +716,14 @@ This document was scraped from Datadog documentation.
                 'total_documents': len(documents),
                 'base_url': self.scraper.base_url,
                 'max_depth': self.scraper.max_depth,
-                'scraping_date': datetime.now().isoformat(),
+                'scraping_date': now_iso,
                 'categories': {cat: len(urls) for cat, urls in categories.items()},
                 'version': '1.0',
                 'format': 'rag_enhanced'
             }
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_file(filename, orjson.dumps(output, option=orjson.OPT_INDENT_2))
         
         stats = {
             'total_documents': len(documents),
@@ -448,143 +753,543 @@ This document was scraped from Datadog documentation.
 # ============================================================================
 
 
+class AnchorCollector(HTMLParser):
+    """Collect <a href> targets, their text and the page text in one streaming pass
+    
+    Used for link discovery instead of BeautifulSoup, so no DOM is built for
+    pages that are only scanned for links.
+    """
+
+    _skipped_tags = ('script', 'style')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = []  # (href, text chunks) in document order
+        self.text = []
+        self._anchor_text = None
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._anchor_text = None
+            for name, value in attrs:
+                if name == 'href' and value is not None:
+                    self._anchor_text = []
+                    self.anchors.append((value, self._anchor_text))
+                    break
+        elif tag in self._skipped_tags:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'a':
+            self._anchor_text = None
+        elif tag in self._skipped_tags and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self.text.append(data)
+        if self._anchor_text is not None:
+            self._anchor_text.append(data)
+
+
+_DIGITS_RE = re.compile(r'\d+')
+
+# Regex link scan used instead of AnchorCollector unless accurate parsing is
+# requested. Script/style bodies and comments are cut first so markup inside
+# them is never taken for a link; anchor text runs to </a> or the next <a>.
+_NON_CONTENT_RE = re.compile(r'<(script|style)\b.*?</\1\s*>|<!--.*?-->', re.I | re.S)
+_ANCHOR_RE = re.compile(
+    r'''<a(?=\s)[^>]*?\shref\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))[^>]*>(.*?)(?:</a\s*>|(?=<a[\s>])|\Z)''',
+    re.I | re.S
+)
+_TAG_RE = re.compile(r'<[^>]*>')
+
+# Same-domain links that are never HTML pages; recorded but never fetched
+_SKIP_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp', '.ico', '.pdf', '.zip',
+    '.tar', '.gz', '.css', '.js', '.json', '.xml', '.woff', '.woff2', '.ttf',
+    '.mp4', '.webm'
+})
+
+
+def is_asset_url(url: str) -> bool:
+    """True for URLs whose extension marks them as assets rather than pages"""
+    last_segment = url[url.rfind('/') + 1:]
+    return last_segment[last_segment.rfind('.'):].lower() in _SKIP_EXTENSIONS
+
+# Translated copies of the docs (/fr/..., /ja/...) repeat every English page;
+# one alternation over the first path segment rejects them all in a single match
+_LOCALIZED_PATH_RE = re.compile(r'[^:/]+://[^/]*/(?:fr|ja|ko|es|it|pt|zh|de)(?:/|$)')
+
+# Bump whenever parse_links changes which links it keeps or how it fingerprints,
+# so links cached for conditional GETs under the old rules are not reused
+LINK_FILTER_VERSION = 3
+
+
+def scan_anchors(html: str):
+    """Return (page text, [(href, anchor text chunks)]) using regexes only
+    
+    Matches what AnchorCollector reports for ordinary markup at a fraction of
+    the cost, since no tokenizer runs in Python.
+    """
+    html = _NON_CONTENT_RE.sub('', html)
+    anchors = [
+        (unescape(quoted or single or bare or ''),
+         (unescape(chunk) for chunk in _TAG_RE.split(inner)))
+        for quoted, single, bare, inner in _ANCHOR_RE.findall(html)
+    ]
+    return unescape(_TAG_RE.sub('', html)), anchors
+
+
+def parse_links(url: str, html: bytes, domain: str, accurate: bool = False):
+    """Return (content fingerprint, same-domain links) for a downloaded page
+    
+    Module-level so it can run in a parser process. With accurate=True the page
+    goes through the AnchorCollector HTML parser instead of the regex scan.
+    """
+    html = html.decode('utf-8', errors='replace')
+    if accurate:
+        collector = AnchorCollector()
+        collector.feed(html)
+        collector.close()
+        text, anchors = ''.join(collector.text), collector.anchors
+    else:
+        text, anchors = scan_anchors(html)
+
+    links = []
+    seen_hrefs = set()
+    seen_urls = set()
+    parsed = urlparse(url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+
+    for href, text_chunks in anchors:
+
+        # Nav/footer links repeat on every page; resolve each href only once
+        if href in seen_hrefs:
+            continue
+        seen_hrefs.add(href)
+
+        # Site-absolute hrefs ("/docs/x") are most links on the docs; they only
+        # need the page's origin prepended unless they carry dot segments
+        if href[:1] == '/' and href[1:2] != '/' and '/.' not in href:
+            absolute_url = origin + href
+        else:
+            absolute_url = urljoin(url, href)
+
+        # Only include links from same domain (one cached parse per URL)
+        netloc, normalized = split_url(absolute_url)
+        if netloc == domain:
+            if normalized in seen_urls:
+                continue
+            if _LOCALIZED_PATH_RE.match(normalized):
+                continue
+            seen_urls.add(normalized)
+            links.append({
+                'text': ''.join(chunk.strip() for chunk in text_chunks),
+                'url': normalized
+            })
+
+    # Digits are dropped from the text so dates don't change the fingerprint; the
+    # link targets are hashed as-is, so pages whose links differ only by version
+    # are not treated as copies of each other
+    digest = hashlib.blake2b(_DIGITS_RE.sub('', text).encode('utf-8'), digest_size=16)
+    digest.update(b'\0')
+    digest.update('\n'.join(link['url'] for link in links).encode('utf-8'))
+    return digest.digest(), links
+
+
 class DatadogDocsScraper:
-    def __init__(self, base_url, max_depth=2, delay=0.5):
+    _category_re = re.compile(r'^[^:/]+://[^/]*/+([^/?#]*)')
+
+    def __init__(self, base_url, max_depth=2, delay=0.5, max_workers=8,
+                 cache_file=None, force_refresh=False, session=None, accurate=False,
+                 state_db=None):
         self.base_url = base_url
         self.max_depth = max_depth
         self.delay = delay  # Delay between requests (be respectful)
+        self.max_workers = max_workers  # Concurrent page fetches per depth level
+        self.cache_file = cache_file  # Conditional-GET cache persisted between crawls
+        self.force_refresh = force_refresh  # Ignore cached validators and refetch everything
+        self.accurate = accurate  # Parse links with a full HTML parser instead of regexes
+        # Cached links are only reused when produced by the same parser and filters
+        self._cache_tag = f"{'accurate' if accurate else 'regex'}:{LINK_FILTER_VERSION}"
+        self.state_db = state_db  # SQLite checkpoint file for resuming an interrupted crawl
+        self.http_cache = self.load_http_cache() if cache_file else {}
         self.visited = set()
-        self.links_tree = defaultdict(list)
-        self.domain = urlparse(base_url).netloc
+        self.url_depth = {}  # URL -> shallowest depth it was reached at
+        self.links_tree = defaultdict(list)  # parent URL -> child URLs it first reached
+        self.content_fingerprints = set()  # Digests of page text already crawled
+        self._parse_pool = None  # Set while scrape_recursive() runs
+        self.domain = urlparse(base_url).netloc.lower()
         self.is_scraping = False
         self.last_scraped = None
         self.results = {}
+        self.results_bytes = None  # `results` pre-encoded once a crawl completes
 
-    def is_valid_url(self, url):
-        """Check if URL belongs to the same domain"""
-        parsed = urlparse(url)
-        return parsed.netloc == self.domain
-
-    def normalize_url(self, url):
-        """Remove fragments and trailing slashes for consistency"""
-        parsed = urlparse(url)
-        normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-        if normalized.endswith('/'):
-            normalized = normalized[:-1]
-        return normalized
-
-    def extract_links(self, url):
-        """Extract all links from a given URL"""
-        print(f"Scraping: {url}")
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.content, 'html.parser')
-        links = []
-
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(url, href)
-
-            # Only include links from same domain
-            if self.is_valid_url(absolute_url):
-                normalized = self.normalize_url(absolute_url)
-                links.append({
-                    'text': link.get_text(strip=True),
-                    'url': normalized
-                })
+        # One pooled session shared by all fetch workers for keep-alive reuse;
+        # a caller-provided session (e.g. the API's) outlives this scraper
+        self._owns_session = session is None
+        self.session = session or create_session(max(50, max_workers))
 
-        return links
+    def close(self):
+        """Release pooled connections held by the scraper's own session"""
+        if self._owns_session:
+            self.session.close()
 
-    def scrape_recursive(self, url, depth=0, parent_url=None):
-        """Recursively scrape links up to max_depth"""
-        normalized_url = self.normalize_url(url)
+    def __enter__(self):
+        return self
 
-        # Stop conditions
-        if depth > self.max_depth:
-            return
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-        if normalized_url in self.visited:
-            return
+    def is_valid_url(self, url):
+        """Check if URL belongs to the same domain and is not a translated copy"""
+        netloc, normalized = split_url(url)
+        return netloc == self.domain and not _LOCALIZED_PATH_RE.match(normalized)
 
-        self.visited.add(normalized_url)
+    def normalize_url(self, url):
+        """Remove fragments, query strings and trailing slashes for consistency
+        
+        The host is lowercased so case variants of the same page collapse to one
+        entry. Results are interned so visited, links_tree and the per-page link
+        lists all share a single string object per URL.
+        """
+        return split_url(url)[1]
 
-        # Extract links from current page
-        links = self.extract_links(url)
+    def extract_links(self, url):
+        """Extract all links from a given URL
+        
+        Returns [] for a page whose content was already seen under another URL.
+        """
+        fingerprint, links = self.fetch_page(url)
+        if fingerprint is None:
+            return []
+        return links if self.is_new_content(fingerprint, url) else []
 
-        # Store in tree structure
-        if parent_url:
-            parent_normalized = self.normalize_url(parent_url)
-            self.links_tree[parent_normalized].append({
-                'url': normalized_url,
-                'depth': depth,
-                'children': []
-            })
+    def is_new_content(self, fingerprint, url):
+        """Record fingerprint and report whether it is the first page with that content
+        
+        Not thread-safe; scrape_recursive() only calls it from its coordinating thread.
+        """
+        if fingerprint in self.content_fingerprints:
+            logger.info("Duplicate content, not following links: %s", url)
+            return False
+        self.content_fingerprints.add(fingerprint)
+        return True
+
+    def fetch_page(self, url):
+        """Return (content fingerprint, same-domain links) for url
+        
+        The fingerprint is None for non-HTML responses. With a cache file
+        configured, pages fetched on a previous run are requested conditionally
+        (If-None-Match / If-Modified-Since) and a 304 reuses the links stored for
+        them instead of downloading and parsing again.
+        """
+        logger.info("Scraping: %s", url)
+        cached = None if self.force_refresh else self.http_cache.get(url)
+        if cached and cached.get('parser') != self._cache_tag:
+            cached = None
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        # Stream so the body of a non-HTML response is never downloaded; the
+        # with-block returns the connection to the pool on every exit path
+        with self.session.get(url, timeout=10, headers=headers, stream=True) as response:
+            if cached and response.status_code == 304:
+                return bytes.fromhex(cached['fingerprint']), cached['links']
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', 'text/html')
+            if 'html' not in content_type.lower():
+                logger.info("Skipping non-HTML content (%s): %s", content_type, url)
+                return None, []
+            html = response.content
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        fingerprint, links = self._parse_links(url, html)
+        if self.cache_file and (etag or last_modified):
+            # One key per page, each written by a single worker thread
+            self.http_cache[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'parser': self._cache_tag,
+                'fingerprint': fingerprint.hex(),
+                'links': links
+            }
 
-        # Add delay to be respectful
-        time.sleep(self.delay)
+        return fingerprint, links
 
-        # Recursively scrape child links
+    def _parse_links(self, url, html):
+        """Return (content fingerprint, same-domain links) for a downloaded page
+        
+        Runs on the crawl's process pool when one is active, so parsing is not
+        serialized by the GIL across fetch threads.
+        """
+        if self._parse_pool is None:
+            return parse_links(url, html, self.domain, self.accurate)
+        fingerprint, links = self._parse_pool.submit(
+            parse_links, url, html, self.domain, self.accurate
+        ).result()
         for link in links:
-            child_url = link['url']
-            if child_url not in self.visited:
-                self.scrape_recursive(child_url, depth + 1, normalized_url)
+            link['url'] = sys.intern(link['url'])
+        return fingerprint, links
+
+    def load_http_cache(self):
+        """Load validators and links saved by a previous crawl, if any"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = orjson.loads(f.read())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            return {}
+        for entry in cache.values():
+            for link in entry['links']:
+                link['url'] = sys.intern(link['url'])
+        return cache
+
+    def save_http_cache(self):
+        """Persist validators and links so the next crawl can revalidate pages"""
+        if self.cache_file:
+            write_file(self.cache_file, orjson.dumps(self.http_cache))
+
+    def open_state_db(self):
+        """Open the checkpoint database and return the frontier of an interrupted crawl
+        
+        If the previous crawl stopped part-way, its pages, tree edges and content
+        fingerprints are loaded back into memory and the level it was about to
+        fetch is returned. Otherwise the database is cleared and [] is returned.
+        """
+        db = sqlite3.connect(self.state_db)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.executescript('''
+            CREATE TABLE IF NOT EXISTS pages(url TEXT PRIMARY KEY, depth INTEGER);
+            CREATE TABLE IF NOT EXISTS edges(parent TEXT, child TEXT, depth INTEGER);
+            CREATE TABLE IF NOT EXISTS fingerprints(digest BLOB PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS frontier(url TEXT, depth INTEGER, parent TEXT);
+        ''')
+
+        frontier = db.execute('SELECT url, depth, parent FROM frontier ORDER BY rowid').fetchall()
+        if not frontier:
+            db.executescript('DELETE FROM pages; DELETE FROM edges; DELETE FROM fingerprints;')
+            return db, []
+
+        for page_url, page_depth in db.execute('SELECT url, depth FROM pages'):
+            page_url = sys.intern(page_url)
+            self.visited.add(page_url)
+            self.url_depth[page_url] = page_depth
+        for parent, child in db.execute('SELECT parent, child FROM edges ORDER BY rowid'):
+            self.links_tree[sys.intern(parent)].append(sys.intern(child))
+        self.content_fingerprints.update(digest for (digest,) in db.execute('SELECT digest FROM fingerprints'))
+
+        logger.info("Resuming crawl: %d pages done, %d queued", len(self.visited), len(frontier))
+        return db, [(sys.intern(page_url), page_depth, parent and sys.intern(parent))
+                    for page_url, page_depth, parent in frontier]
+
+    def checkpoint(self, db, pages, edges, level):
+        """Record a fetched level and the queue for the next one in one transaction
+        
+        Queued URLs that are already visited, or repeated within the level, add
+        nothing when processed, so only the first entry for each new URL is kept.
+        """
+        pending = {}
+        for entry in level:
+            if entry[0] not in self.visited:
+                pending.setdefault(entry[0], entry)
+
+        with db:
+            db.executemany('INSERT OR REPLACE INTO pages VALUES (?, ?)', pages)
+            db.executemany('INSERT INTO edges VALUES (?, ?, ?)', edges)
+            db.executemany('INSERT OR IGNORE INTO fingerprints VALUES (?)',
+                           ((digest,) for digest in self.content_fingerprints))
+            db.execute('DELETE FROM frontier')
+            db.executemany('INSERT INTO frontier VALUES (?, ?, ?)', pending.values())
 
-        return links
+    def scrape_recursive(self, url, depth=0, parent_url=None):
+        """Scrape links breadth-first up to max_depth
+        
+        Each depth level is fetched concurrently on a thread pool and parsed on a
+        process pool, while this thread alone updates visited, url_depth and
+        links_tree, so no locking is needed. `delay` spaces out request starts
+        to each host across all workers. Pages with identical content are
+        resolved on this thread in level order, so the same copy wins every run.
+        
+        With state_db set, every finished level is checkpointed to SQLite and a
+        crawl that was interrupted resumes from the level it had queued.
+        """
+        limiter = HostRateLimiter(self.delay)
+
+        def fetch_links(page_url):
+            limiter.wait(page_url)
+            try:
+                return self.fetch_page(page_url)
+            except Exception as e:
+                logger.warning("Error scraping %s: %s", page_url, e)
+                return None, []
+
+        level = [(url, depth, self.normalize_url(parent_url) if parent_url else None)]
+        db = None
+        if self.state_db:
+            db, frontier = self.open_state_db()
+            level = frontier or level
+
+        with parser_pool() as parse_pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._parse_pool = parse_pool
+            try:
+                while level:
+                    batch = []
+                    pages = []
+                    edges = []
+                    for page_url, page_depth, parent in level:
+                        normalized_url = self.normalize_url(page_url)
+
+                        # Stop conditions
+                        if page_depth > self.max_depth:
+                            continue
+
+                        if normalized_url in self.visited:
+                            if page_depth < self.url_depth[normalized_url]:
+                                self.url_depth[normalized_url] = page_depth
+                            continue
+
+                        self.visited.add(normalized_url)
+                        self.url_depth[normalized_url] = page_depth
+                        pages.append((normalized_url, page_depth))
+
+                        # Store in tree structure
+                        if parent:
+                            self.links_tree[parent].append(normalized_url)
+                            edges.append((parent, normalized_url, page_depth))
+
+                        # Images, PDFs, archives etc. are listed but not downloaded
+                        if is_asset_url(normalized_url):
+                            continue
+
+                        batch.append((page_url, normalized_url, page_depth))
+
+                    # Fetch the whole level at once, then queue the children
+                    level = []
+                    results = executor.map(fetch_links, [page_url for page_url, _, _ in batch])
+                    for (page_url, normalized_url, page_depth), (fingerprint, links) in zip(batch, results):
+                        # Pages mirrored under several URLs have the same content;
+                        # only the links of the first copy are followed
+                        if fingerprint is not None and not self.is_new_content(fingerprint, page_url):
+                            continue
+                        for link in links:
+                            level.append((link['url'], page_depth + 1, normalized_url))
+
+                    if db is not None:
+                        self.checkpoint(db, pages, edges, level)
+            finally:
+                self._parse_pool = None
+                if db is not None:
+                    db.close()
+
+        self.save_http_cache()
+        flush_logging()
+
+    def export_tree(self):
+        """Return links_tree in its serialized form, parent -> [{url, depth, children}]
+        
+        links_tree keeps bare child URLs rather than a dict per edge. Every URL
+        gets exactly one edge, from the page that first reached it, so its edge
+        depth is its url_depth.
+        """
+        url_depth = self.url_depth
+        return {
+            parent: [{'url': child, 'depth': url_depth[child], 'children': []} for child in children]
+            for parent, children in self.links_tree.items()
+        }
 
     def get_all_links(self):
         """Get all discovered links"""
         return sorted(list(self.visited))
 
+    def iter_jsonl(self):
+        """Yield one JSON line per visited URL with its depth and parent, in URL order"""
+        parents = {}
+        for parent, children in self.links_tree.items():
+            for child in children:
+                parents.setdefault(child, parent)
+
+        for url in sorted(self.visited):
+            yield orjson.dumps({
+                'url': url,
+                'depth': self.url_depth.get(url),
+                'parent': parents.get(url)
+            }, option=orjson.OPT_APPEND_NEWLINE)
+
+    def save_jsonl(self, filename='datadog_links.jsonl'):
+        """Save results as JSON Lines, one object per URL, without building one big payload"""
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            f.writelines(self.iter_jsonl())
+        print(f"  - {filename} (JSON Lines)")
+
     def save_results(self, filename='datadog_all_links.txt',
                      json_filename='datadog_links.json',
-                     detailed_filename='datadog_links_detailed.txt'):
-        """Save results to files"""
+                     detailed_filename='datadog_links_detailed.txt', compress=False):
+        """Save results to files
+        
+        With compress=True each file is gzip-compressed and gets a .gz suffix;
+        the repeated URL prefixes shrink the listings several times over.
+        """
+        if compress:
+            filename, json_filename, detailed_filename = (
+                f"{name}.gz" for name in (filename, json_filename, detailed_filename)
+            )
+
+        def open_text(path):
+            if compress:
+                return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+            return open(path, 'w', encoding='utf-8')
+
+        # Sort and categorize once; all three files are written from these
+        sorted_urls = sorted(self.visited)
+        categorized = defaultdict(list)
+        for url in sorted_urls:
+            # Extract category (first path segment) without a full urlparse
+            match = self._category_re.match(url)
+            categorized[(match.group(1) if match else '') or 'root'].append(url)
 
         # Save simple text file (just URLs)
-        with open(filename, 'w', encoding='utf-8') as f:
+        with open_text(filename) as f:
             f.write(f"Datadog Documentation Links\n")
             f.write(f"Scraped from: {self.base_url}\n")
             f.write(f"Total links found: {len(self.visited)}\n")
             f.write(f"Max depth: {self.max_depth}\n")
             f.write("="*80 + "\n\n")
-            for url in sorted(self.visited):
-                f.write(f"{url}\n")
+            f.writelines(f"{url}\n" for url in sorted_urls)
 
         # Save detailed text file with categorization
-        with open(detailed_filename, 'w', encoding='utf-8') as f:
+        with open_text(detailed_filename) as f:
             f.write(f"Datadog Documentation Links - Detailed Report\n")
             f.write(f"Scraped from: {self.base_url}\n")
             f.write(f"Total links found: {len(self.visited)}\n")
             f.write(f"Max depth: {self.max_depth}\n")
             f.write("="*80 + "\n\n")
 
-            # Categorize links by section
-            categorized = defaultdict(list)
-            for url in sorted(self.visited):
-                # Extract category from URL path
-                path_parts = urlparse(url).path.strip('/').split('/')
-                category = path_parts[0] if path_parts and path_parts[0] else 'root'
-                categorized[category].append(url)
-
             # Write categorized links
             for category in sorted(categorized.keys()):
                 f.write(f"\n{'='*80}\n")
                 f.write(f"Category: {category.upper()}\n")
                 f.write(f"Count: {len(categorized[category])}\n")
                 f.write(f"{'='*80}\n\n")
-                for i, url in enumerate(categorized[category], 1):
-                    f.write(f"{i}. {url}\n")
+                f.writelines(f"{i}. {url}\n" for i, url in enumerate(categorized[category], 1))
 
         # Save as JSON with tree structure
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                'total_links': len(self.visited),
-                'base_url': self.base_url,
-                'max_depth': self.max_depth,
-                'links': sorted(list(self.visited)),
-                'tree': dict(self.links_tree)
-            }, f, indent=2)
+        payload = orjson.dumps({
+            'total_links': len(self.visited),
+            'base_url': self.base_url,
+            'max_depth': self.max_depth,
+            'links': sorted_urls,
+            'tree': self.export_tree()
+        }, option=orjson.OPT_INDENT_2)
+        write_file(json_filename, gzip.compress(payload, compresslevel=6) if compress else payload)
 
         print(f"\nResults saved to:")
         print(f"  - {filename} (simple list)")
@@ -592,14 +1297,30 @@ class DatadogDocsScraper:
         print(f"  - {json_filename} (JSON format)")
 
 
+# Validators and links from previous API crawls, used for conditional GETs
+HTTP_CACHE_FILE = 'datadog_http_cache.json'
+
 # Global scraper instance
 scraper = DatadogDocsScraper(base_url="https://docs.datadoghq.com/")
 
+# Held while a crawl runs so concurrent triggers can't interleave on `scraper`
+scrape_lock = threading.Lock()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Share one pooled HTTP session across every crawl triggered through the API"""
+    app.state.session = create_session()
+    yield
+    app.state.session.close()
+
+
 # FastAPI app instance
 app = FastAPI(
     title="Datadog Scraper API",
     description="API for scraping Datadog documentation with n8n integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Pydantic models for API
@@ -607,6 +1328,7 @@ class ScrapeRequest(BaseModel):
     max_depth: Optional[int] = 2
     delay: Optional[float] = 0.5
     save_results: Optional[bool] = True
+    force: Optional[bool] = False  # Bypass the conditional-GET cache
 
 class ScrapeResponse(BaseModel):
     status: str
@@ -620,42 +1342,77 @@ class WebhookPayload(BaseModel):
     data: Optional[Dict] = None
 
 
-def run_scraping(max_depth: int = 2, delay: float = 0.5, save_results: bool = True):
+def run_scraping(max_depth: int = 2, delay: float = 0.5, save_results: bool = True,
+                 force: bool = False, session: Optional[requests.Session] = None):
     """Run the scraping process"""
     global scraper
 
-    # Reset scraper state
-    scraper = DatadogDocsScraper(
-        base_url="https://docs.datadoghq.com/",
-        max_depth=max_depth,
-        delay=delay
-    )
+    # Only one crawl at a time; overlapping triggers are ignored
+    if not scrape_lock.acquire(blocking=False):
+        logger.warning("Scraping already in progress, ignoring request")
+        return False
+
+    try:
+        # Reset scraper state
+        current = DatadogDocsScraper(
+            base_url="https://docs.datadoghq.com/",
+            max_depth=max_depth,
+            delay=delay,
+            cache_file=HTTP_CACHE_FILE,
+            force_refresh=force,
+            session=session
+        )
+        current.is_scraping = True
+        scraper = current
+        start_time = time.time()
 
-    scraper.is_scraping = True
-    start_time = time.time()
-
-    scraper.scrape_recursive(scraper.base_url)
-    scraping_time = time.time() - start_time
-    scraper.last_scraped = datetime.now().isoformat()
-
-    # Store results
-    scraper.results = {
-        'total_links': len(scraper.visited),
-        'base_url': scraper.base_url,
-        'max_depth': scraper.max_depth,
-        'links': scraper.get_all_links(),
-        'tree': dict(scraper.links_tree),
-        'scraping_time': scraping_time,
-        'timestamp': scraper.last_scraped
-    }
+        try:
+            current.scrape_recursive(current.base_url)
+        finally:
+            current.close()
+        scraping_time = time.time() - start_time
+        current.last_scraped = datetime.now().isoformat()
+
+        # Store results
+        current.results = {
+            'total_links': len(current.visited),
+            'base_url': current.base_url,
+            'max_depth': current.max_depth,
+            'links': current.get_all_links(),
+            'tree': current.export_tree(),
+            'scraping_time': scraping_time,
+            'timestamp': current.last_scraped
+        }
+        current.results_bytes = orjson.dumps(current.results)
 
-    if save_results:
-        scraper.save_results()
+        if save_results:
+            current.save_results()
+    finally:
+        scraper.is_scraping = False
+        scrape_lock.release()
 
-    scraper.is_scraping = False
     return True
 
 
+def results_json() -> bytes:
+    """Encoded results of the last crawl, serialized once rather than per request"""
+    if scraper.results_bytes is None:
+        return orjson.dumps(scraper.results)
+    return scraper.results_bytes
+
+
+def already_running_response() -> Response:
+    """409 answer for a crawl trigger that arrives while a crawl is running"""
+    return Response(
+        status_code=409,
+        content=orjson.dumps({
+            "status": "already_running",
+            "message": "Scraping already in progress, request ignored"
+        }),
+        media_type='application/json'
+    )
+
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -682,7 +1439,11 @@ async def health_check():
 async def trigger_scrape(request: ScrapeRequest, background_tasks: BackgroundTasks):
     """Trigger scraping process (for n8n webhooks)"""
 
-    background_tasks.add_task(run_scraping, request.max_depth, request.delay, request.save_results)
+    if scrape_lock.locked():
+        return already_running_response()
+
+    background_tasks.add_task(run_scraping, request.max_depth, request.delay, request.save_results,
+                              request.force, app.state.session)
 
     return {
         "status": "started",
@@ -706,32 +1467,56 @@ async def get_status():
 async def get_results():
     """Get scraping results"""
 
-    return JSONResponse(content=scraper.results)
+    return Response(content=results_json(), media_type='application/json')
 
 
 @app.get("/results/json")
 async def download_json():
     """Download results as JSON file"""
 
-    # Save current results to file
-    json_filename = 'datadog_links_api.json'
-    with open(json_filename, 'w', encoding='utf-8') as f:
-        json.dump(scraper.results, f, indent=2)
-
-    return FileResponse(
-        json_filename,
+    # Serialize straight into the response instead of round-tripping via disk
+    return Response(
+        content=orjson.dumps(scraper.results, option=orjson.OPT_INDENT_2),
         media_type='application/json',
-        filename='datadog_scraper_results.json'
+        headers={'Content-Disposition': 'attachment; filename="datadog_scraper_results.json"'}
+    )
+
+
+@app.get("/results/jsonl")
+async def download_jsonl():
+    """Stream results as JSON Lines, one object per URL
+    
+    Only a finished crawl is streamed: its scraper is never modified again,
+    since every new crawl runs on a fresh DatadogDocsScraper.
+    """
+    current = scraper
+    if current.is_scraping:
+        return Response(
+            status_code=409,
+            content=orjson.dumps({
+                "status": "error",
+                "message": "Scraping in progress, results are not available yet"
+            }),
+            media_type='application/json'
+        )
+
+    return StreamingResponse(
+        current.iter_jsonl(),
+        media_type='application/x-ndjson',
+        headers={'Content-Disposition': 'attachment; filename="datadog_scraper_results.jsonl"'}
     )
 
 
 @app.post("/webhook")
-async def n8n_webhook(payload: WebhookPayload):
+async def n8n_webhook(payload: WebhookPayload, background_tasks: BackgroundTasks):
     """Webhook endpoint for n8n integration"""
 
     if payload.action == "start_scraping":
-        # Trigger scraping with default parameters
-        threading.Thread(target=run_scraping, daemon=True).start()
+        if scrape_lock.locked():
+            return already_running_response()
+
+        # Trigger scraping with default parameters after the response is sent
+        background_tasks.add_task(run_scraping, session=app.state.session)
 
         return {
             "status": "success",
@@ -740,11 +1525,11 @@ async def n8n_webhook(payload: WebhookPayload):
         }
 
     elif payload.action == "get_results":
-        return {
+        return Response(content=orjson.dumps({
             "status": "success",
-            "data": scraper.results,
+            "data": orjson.Fragment(results_json()),
             "timestamp": datetime.now().isoformat()
-        }
+        }), media_type='application/json')
 
 
 @app.get("/export/rag/{format_type}")
@@ -789,7 +1574,7 @@ async def export_rag(format_type: str):
     
     elif format_type == "all":
         stats = exporter.export_all()
-        return JSONResponse(content={
+        return Response(content=orjson.dumps({
             "status": "success",
             "message": "All RAG formats exported",
             "statistics": stats,
@@ -798,30 +1583,37 @@ async def export_rag(format_type: str):
                 "markdown": "output/datadog_markdown/",
                 "json": "output/datadog_rag_enhanced.json"
             }
-        })
-def print_tree(scraper, url, visited_in_tree=None, prefix="", is_last=True):
-    """Print links in a tree structure"""
+        }), media_type='application/json')
+def tree_lines(scraper, url, visited_in_tree=None, prefix="", is_last=True):
+    """Yield the lines of the link tree rooted at url, using an explicit stack"""
     if visited_in_tree is None:
         visited_in_tree = set()
 
-    if url in visited_in_tree:
-        return
+    stack = [(url, prefix, is_last)]
+    while stack:
+        url, prefix, is_last = stack.pop()
+        if url in visited_in_tree:
+            continue
 
-    visited_in_tree.add(url)
+        visited_in_tree.add(url)
 
-    # Print current URL
-    connector = "└── " if is_last else "├── "
-    print(f"{prefix}{connector}{url}")
+        # Current URL
+        connector = "└── " if is_last else "├── "
+        yield f"{prefix}{connector}{url}\n"
 
-    # Get children
-    children = scraper.links_tree.get(url, [])
-
-    # Print children
-    for i, child in enumerate(children):
-        child_url = child['url']
-        is_last_child = (i == len(children) - 1)
+        # Push children in reverse so they come off the stack in order
+        children = scraper.links_tree.get(url, [])
         extension = "    " if is_last else "│   "
-        print_tree(scraper, child_url, visited_in_tree, prefix + extension, is_last_child)
+        for i in range(len(children) - 1, -1, -1):
+            stack.append((children[i], prefix + extension, i == len(children) - 1))
+
+
+def print_tree(scraper, url, visited_in_tree=None, prefix="", is_last=True, file=None):
+    """Print links in a tree structure
+    
+    Lines are written in one writelines() call instead of a print() per node.
+    """
+    (file or sys.stdout).writelines(tree_lines(scraper, url, visited_in_tree, prefix, is_last))
 
 
 def run_api_server(host: str = "0.0.0.0", port: int = 8000):
@@ -880,10 +1672,16 @@ Examples:
                        help='Maximum depth for scraping (default: 3 for complete coverage)')
     parser.add_argument('--delay', type=float, default=0.3,
                        help='Delay between requests in seconds (default: 0.3)')
+    parser.add_argument('--accurate', action='store_true',
+                       help='Find links with a full HTML parser instead of the faster regex scan')
+    parser.add_argument('--state-db', type=str, default=None,
+                       help='Checkpoint crawl progress to this SQLite file and resume from it if interrupted')
     parser.add_argument('--output-dir', type=str, default='output',
                        help='Output directory for results (default: output)')
     parser.add_argument('--save-results', action='store_true', default=True,
                        help='Save results to files (default: True)')
+    parser.add_argument('--compress', action='store_true',
+                       help='Gzip the saved result files (.gz)')
     
     # API server options
     parser.add_argument('--port', type=int, default=8000,
@@ -892,6 +1690,7 @@ Examples:
                        help='Host for API server (default: 0.0.0.0)')
     
     args = parser.parse_args()
+    setup_logging()
 
     # Environment variable override (Docker compatibility)
     env_max_depth = os.getenv('MAX_DEPTH')
@@ -932,7 +1731,9 @@ Examples:
         scraper_instance = DatadogDocsScraper(
             base_url=base_url,
             max_depth=args.max_depth,
-            delay=args.delay
+            delay=args.delay,
+            accurate=args.accurate,
+            state_db=args.state_db
         )
         extractor = ContentExtractor()
         
@@ -940,6 +1741,7 @@ Examples:
         print("Starting recursive scrape...")
         start_time = time.time()
         scraper_instance.scrape_recursive(base_url)
+        scraper_instance.close()
         elapsed = time.time() - start_time
         
         print(f"\n✅ Scraping completed in {elapsed:.2f}s - {len(scraper_instance.visited)} URLs found")
@@ -974,23 +1776,20 @@ Examples:
         
         else:
             # Original combined extraction
-            extracted = []
-            for i, url in enumerate(sorted(scraper_instance.visited), 1):
-                print(f"  [{i}/{len(scraper_instance.visited)}] {url}")
-                content = extractor.extract_content(url)
-                extracted.append(content)
-                time.sleep(args.delay)
+            extracted = extractor.extract_content_batch(sorted(scraper_instance.visited),
+                                                        delay=args.delay)
+            extractor.close()
             
             # Save extracted content
             content_file = os.path.join(content_dir, 'extracted_content.json')
-            with open(content_file, 'w', encoding='utf-8') as f:
-                json.dump(extracted, f, indent=2, ensure_ascii=False)
+            with open(content_file, 'wb') as f:
+                f.write(orjson.dumps(extracted, option=orjson.OPT_INDENT_2))
             
             print(f"\n✅ Extracted {len(extracted)} pages to {content_file}")
         
         # Save standard results
         if args.save_results:
-            scraper_instance.save_results()
+            scraper_instance.save_results(compress=args.compress)
         
         # Auto-export to RAG if requested
         if args.export_rag:
@@ -1012,8 +1811,9 @@ Examples:
         
         # Load existing scraper data
         base_url = "https://docs.datadoghq.com/"
-        scraper_instance = DatadogDocsScraper(base_url=base_url)
+        scraper_instance = DatadogDocsScraper(base_url=base_url, accurate=args.accurate)
         scraper_instance.scrape_recursive(base_url)
+        scraper_instance.close()
         
         exporter = RAGExporter(scraper_instance)
         
@@ -1043,12 +1843,15 @@ Examples:
         scraper_instance = DatadogDocsScraper(
             base_url=base_url,
             max_depth=args.max_depth,
-            delay=args.delay
+            delay=args.delay,
+            accurate=args.accurate,
+            state_db=args.state_db
         )
         
         print("Starting recursive scrape...\n")
         start_time = time.time()
         scraper_instance.scrape_recursive(base_url)
+        scraper_instance.close()
         elapsed_time = time.time() - start_time
         
         print("\n" + "="*80)
@@ -1057,17 +1860,13 @@ Examples:
         print("="*80 + "\n")
         
         if args.save_results:
-            scraper_instance.save_results()
+            scraper_instance.save_results(compress=args.compress)
             
             # Save tree structure
-            with open('datadog_tree_structure.txt', 'w', encoding='utf-8') as f:
-                import sys
-                old_stdout = sys.stdout
-                sys.stdout = f
-                print(f"Link Tree Structure for {base_url}")
-                print("="*80 + "\n")
-                print_tree(scraper_instance, scraper_instance.normalize_url(base_url))
-                sys.stdout = old_stdout
+            with open('datadog_tree_structure.txt', 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.write(f"Link Tree Structure for {base_url}\n")
+                f.write("="*80 + "\n\n")
+                print_tree(scraper_instance, scraper_instance.normalize_url(base_url), file=f)
             
             print("Tree structure saved to: datadog_tree_structure.txt")
         